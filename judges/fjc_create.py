@@ -5,23 +5,24 @@ Copyright 2020-2021, Corey Rayburn Yung
 License: Apache-2.0 (https://www.apache.org/licenses/LICENSE-2.0)
 """
 from __future__ import annotations
-import csv
+import os
 import pathlib
-import re
-from shutil import copyfile
 import warnings
 
 import numpy as np
 import pandas as pd
-import requests
 
 from judges import instructions
 
 
+_PUNCTUATION = str.maketrans('', '', ".,[]'")
+
+
 # def download_file(url: str, 
 #                   file_path: pathlib.Path, 
 #                   session: requests.Session = None):
 #     """Downloads file at 'url' to 'file_path'."""
+#     import requests
 #     tool = session or requests
 #     response = getattr(tool, 'get')(url)
 #     with open(file_path, 'wb') as downloaded:  
@@ -30,6 +31,7 @@ from judges import instructions
 
 # def download_fjc():
 #     """Downloads all fjc files based on module constants."""
+#     import requests
 #     session = requests.Session()
 #     for source in ['SERVICE', 'CAREER', 'DEMOGRAPHICS']:
 #         str_path = getattr(instructions, f'{source}_PATH']
@@ -39,11 +41,18 @@ from judges import instructions
 #             download_file(url = url, file_path = file_path, session = session)
 #     return
 
-def load_file(file_path: pathlib.Path, columns: list[str] = None):
+def load_file(file_path: pathlib.Path, 
+              columns: list[str] = None,
+              dtypes: dict[str, str] = None,
+              dates: list[str] = None):
     """Loads file as a pandas DataFrame"""
     kwargs = {'index_col': False, 'encoding': 'windows-1252'}
     if columns:
         kwargs['usecols'] = columns
+    if dtypes:
+        kwargs['dtype'] = dtypes
+    if dates:
+        kwargs['parse_dates'] = dates
     return pd.read_csv(file_path, **kwargs)
 
 def load_fjc() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
@@ -52,7 +61,9 @@ def load_fjc() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     for source in ['SERVICE', 'CAREER', 'DEMOGRAPHICS']:
         str_path = getattr(instructions, f'{source}_PATH')
         file_path = pathlib.Path(str_path)
-        df = load_file(file_path = file_path)
+        dtypes = getattr(instructions, f'{source}_DTYPES')
+        dates = getattr(instructions, f'{source}_DATES')
+        df = load_file(file_path = file_path, dtypes = dtypes, dates = dates)
         dfs.append(df)
     return dfs
 
@@ -60,129 +71,144 @@ def combine_fjc(service: pd.DataFrame,
                 career: pd.DataFrame, 
                 demographics: pd.DataFrame) -> pd.DataFrame:
     """Combines fjc DataFrames into a single pandas DataFrame."""
-    combined = pd.merge(service, 
-                        career, 
-                        on = 'nid', 
-                        suffixes = {'', '_EXTRA'})
+    # Drops columns duplicated in 'service' so that merging needs no suffixes.
+    shared = service.columns.drop('nid')
+    career = career.drop(columns = career.columns.intersection(shared))
+    demographics = demographics.drop(
+        columns = demographics.columns.intersection(shared))
+    # Each judge has several career entries, so this merge is one-to-many.
+    combined = pd.merge(service, career, on = 'nid', how = 'left')
     combined = pd.merge(combined, 
                         demographics, 
                         on = 'nid', 
-                        suffixes = {'', '_EXTRA'})
+                        how = 'left', 
+                        validate = 'many_to_one')
     return combined
             
 def fix_columns(df: pd.DataFrame) -> pd.DataFrame:  
     """Makes basic adjustments to column names and replaces empty data."""
-    df = (df.rename(columns = str.lower)
-        .rename(columns = lambda x: x.replace(' ', '_'))
-        .rename(columns = instructions.SERVICE_RENAMES)
-        .rename(columns = instructions.CAREER_RENAMES)
-        .rename(columns = instructions.DEMOGRAPHICS_RENAMES)
-        .replace(['None (assignment)', 'None (reassignment)'], 
-                 method = 'ffill')
-        .pipe(fill_empty)
-        .astype(dtype = {'nid' : str}))
-    return df     
+    df = df.rename(columns = rename_column)
+    # Narrows the DataFrame before any transforms run over every column.
+    df = df[instructions.ALL_COLUMNS].copy()
+    df = fill_reassignments(df = df)
+    return fill_empty(df = df)
          
+def rename_column(name: str) -> str:
+    """Converts an fjc column name to its name in the munged DataFrame."""
+    name = name.lower().replace(' ', '_')
+    return instructions.ALL_RENAMES.get(name, name)
+
 def munge_fjc(df: pd.DataFrame) -> pd.DataFrame:
     """Adds needed data to fjc judges DataFrame."""
     df = fix_columns(df = df)
-    df = df[instructions.ALL_COLUMNS]
-    df['court_num'] = df['court'].map(instructions.COURT_NUMBERS)
-    df['circuit_num'] = df['court'].map(instructions.CIRCUIT_NUMBERS)
-    df = (df.astype(dtype = {'nid' : int})
-            .astype(dtype = {'senate_vote' : str})
-            .pipe(encode_bio_data)
-            .apply(encode_senate_vote, axis = 'columns')
-            .fillna('')
-            .pipe(time_limit)
-            # .set_index('nid')
-            .pipe(name_changes)
-            .apply(name_perms, axis = 'columns')
-            .reset_index())
-    return df       
+    df['court_num'] = map_category(df['court'], instructions.COURT_NUMBERS)
+    df['circuit_num'] = map_category(df['court'], 
+                                     instructions.CIRCUIT_NUMBERS)
+    df['senate_vote'] = df['senate_vote'].astype(str)
+    df = encode_bio_data(df = df)
+    df = encode_senate_vote(df = df)
+    df = fill_blanks(df = df)
+    df = time_limit(df = df)
+    df = name_changes(df = df)
+    df = name_perms(df = df)
+    return df.reset_index()
+
+def map_category(column: pd.Series, mapping: dict) -> pd.Series:
+    """Maps each category in 'column' once and drops the categorical dtype."""
+    column = column.astype('category')
+    values = np.asarray(column.cat.categories.map(mapping))
+    if column.hasnans:
+        # Missing data has a code of -1, which selects the appended NaN.
+        values = np.append(values, np.nan)
+    return pd.Series(values[column.cat.codes], index = column.index)
+
+def fill_reassignments(df: pd.DataFrame) -> pd.DataFrame:
+    """Carries data forward from a judge's prior entry to reassignments.
+    
+    Each reassignment marker takes the value of the nearest earlier row 
+    without a marker, even when that value is missing. A marker with no
+    earlier row is left as is.
+    
+    """
+    reassigned = df.isin(['None (assignment)', 'None (reassignment)'])
+    rows = pd.Series(np.arange(len(df)))
+    for column in reassigned.columns[reassigned.any()]:
+        marked = reassigned[column].to_numpy()
+        sources = rows.mask(marked).ffill().fillna(rows).astype(int)
+        values = df[column].iloc[sources.to_numpy()]
+        values.index = df.index
+        df[column] = values
+    return df
 
 def fill_empty(df: pd.DataFrame) -> pd.DataFrame:
-    df['senate_vote_type'].replace(np.nan, method = 'ffill', inplace = True)
-    df['senate_vote'].replace(np.nan, method = 'ffill', inplace = True)
+    df['senate_vote_type'] = df['senate_vote_type'].ffill()
+    df['senate_vote'] = df['senate_vote'].ffill()
     return df
 
+def fill_blanks(df: pd.DataFrame) -> pd.DataFrame:
+    """Replaces missing data with empty strings, except in typed columns."""
+    columns = df.select_dtypes(exclude = ['datetime', 'category']).columns
+    return df.fillna(dict.fromkeys(columns, ''))
+
 def encode_bio_data(df: pd.DataFrame) -> pd.DataFrame:
     df['recess'] = np.where(df['recess'].str.len() > 1, True, False)
-    df['party'] = np.where(df['party'] == 'Democratic', -1, 1)
-    df['aba_rating'] = (np.where(df['aba_rating'] 
-                        == 'Exceptionally Well Qualified', 4,
-                        np.where(df['aba_rating'] 
-                                    == 'Well Qualified', 3,
-                        np.where(df['aba_rating'] 
-                                    == 'Qualified', 2,
-                        np.where(df['aba_rating'] 
-                                    == 'Not Qualified', 1, 0)))))
-    df['woman'] = np.where(df['gender'] == 'Female', True, False)
-    df['minority'] = (np.where(df['race'].str.contains('American')
-                                | df['race'].str.contains('Hispanic')
-                                | df['race'].str.contains('Pacific'), True, 
-                                False))
-    df['pres_num'] = df['president'].map(instructions.PRESIDENTS)
+    df['party'] = (map_category(df['party'], instructions.PARTIES)
+                       .fillna(1)
+                       .astype('int8'))
+    df['aba_rating'] = (map_category(df['aba_rating'], 
+                                     instructions.ABA_RATINGS)
+                            .fillna(0)
+                            .astype('int8'))
+    df['woman'] = df['gender'].eq('Female')
+    df['minority'] = df['race'].str.contains('American|Hispanic|Pacific', 
+                                             na = False)
+    df['pres_num'] = map_category(df['president'], instructions.PRESIDENTS)
     return df
 
-def encode_senate_vote(row: pd.Series) -> pd.Series:
-    if row['senate_vote_type'] == 'Voice':
-        row['senate_percent'] = 1
-    elif '/' in row['senate_vote'] and not '//' in row['senate_vote']:
-        yeas, neas = row['senate_vote'].split('/')
-        row['senate_percent'] = int(yeas)/(int(yeas) + int(neas)) 
-    else:
-        row['senate_percent'] = 0
-    return row
+def encode_senate_vote(df: pd.DataFrame) -> pd.DataFrame:
+    """Adds the share of senators voting to confirm each judge."""
+    votes = df['senate_vote']
+    voice = df['senate_vote_type'].eq('Voice')
+    tallies = votes.str.extract(r'^\s*(\d+)\s*/\s*(\d+)\s*$')
+    counted = tallies[0].notna()
+    yeas = pd.to_numeric(tallies[0], errors = 'coerce')
+    neas = pd.to_numeric(tallies[1], errors = 'coerce')
+    percent = yeas / (yeas + neas)
+    df['senate_percent'] = np.where(voice, 1.0, 
+                                    np.where(counted, percent, 0.0))
+    return df
 
 def time_limit(df: pd.DataFrame) -> pd.DataFrame:
     """Limits data to time period when judge was on the bench."""
-    df['termination_date'] = pd.to_datetime(df['termination_date'])
     df['end_year'] = df['termination_date'].dt.year
     df['end_year'] = df['end_year'].replace(np.nan, instructions.END_YEAR)
-    df['start_date'] = pd.to_datetime(df['start_date'])
     df['start_year'] = df['start_date'].dt.year
-    df = df[df['end_year'] > instructions.START_YEAR - 2]
-    df = df[df['start_year'] <= instructions.END_YEAR] 
-    return df
+    return df[(df['end_year'] > instructions.START_YEAR - 2)
+              & (df['start_year'] <= instructions.END_YEAR)]
     
 def name_changes(df: pd.DataFrame) -> pd.DataFrame:
     """Adds rows for known omissions or errors in the FJC data."""  
-    def make_change(df, index_num, col_name, value):
-        row = df.loc[index_num]
-        row[col_name] = value
-        return row   
-    try:
-        df = df.append(make_change(df, 1386716, 'last_name', 'Randall'))
-    except KeyError:
-        pass
-    try:
-        df = df.append(make_change(df, 1382851, 'first_name', 'Sam')) 
-    except KeyError:
-        pass 
-    return df
+    changes = [df[df['nid'] == change['nid']].assign(**change) 
+               for change in instructions.NAME_CHANGES]
+    return pd.concat([df] + changes)
         
-def name_perms(row: pd.Series) -> pd.Series:
+def name_perms(df: pd.DataFrame) -> pd.DataFrame:
     """Constructs a consistent set of name permutations for each judge."""
-    row['first_name'] = re.sub("\.|\,|\[|\]|\'", '', row['first_name'])
-    row['last_name'] = re.sub("\.|\,|\[|\]|\'", '', row['last_name'])
-    row['middle_name'] = re.sub("\.|\,|\[|\]|\'", '', row['middle_name'])
-    first = row['first_name'].strip().upper()
-    first_init = first[0].upper()
-    middle = row['middle_name'].strip().upper()
-    if middle:    
-        middle_init = middle[0].upper()
-    else:
-        middle_init = ''
-    last = row['last_name'].strip().upper()
-    row['name_perm1'] = f'{first} {middle} {last}'
-    row['name_perm2'] = f'{first} {middle_init} {last}'
-    row['name_perm3'] = f'{first} {last}'
-    row['name_perm4'] = f'{first_init} {middle} {last}'
-    row['name_perm5'] = f'{first_init} {middle_init} {last}'
-    row['name_perm6'] = f'{first_init} {last}'
-    row['name_perm7'] = f'{last}'
-    return row
+    for column in ['first_name', 'middle_name', 'last_name']:
+        df[column] = df[column].str.translate(_PUNCTUATION)
+    first = df['first_name'].str.strip().str.upper()
+    first_init = first.str[0].fillna('')
+    middle = df['middle_name'].str.strip().str.upper()
+    middle_init = middle.str[0].fillna('')
+    last = df['last_name'].str.strip().str.upper()
+    df['name_perm1'] = first + ' ' + middle + ' ' + last
+    df['name_perm2'] = first + ' ' + middle_init + ' ' + last
+    df['name_perm3'] = first + ' ' + last
+    df['name_perm4'] = first_init + ' ' + middle + ' ' + last
+    df['name_perm5'] = first_init + ' ' + middle_init + ' ' + last
+    df['name_perm6'] = first_init + ' ' + last
+    df['name_perm7'] = last
+    return df
 
 def make_names_df(df: pd.DataFrame) -> pd.DataFrame:  
     df = df[['start_year', 'end_year', 'court_num', 'circuit_num', 
@@ -190,74 +216,69 @@ def make_names_df(df: pd.DataFrame) -> pd.DataFrame:
              'name_perm5', 'name_perm6', 'name_perm7', 'judge_name']]
     df.sort_values(by = ['court_num'])
     df['year'] = 0
-    df['nindex'] = range(0, len(df))
-    df = pd.wide_to_long(df, 
-                         stubnames = 'name_perm', 
-                         i = 'nindex', 
-                         j = 'nperm')        
+    df = df.melt(
+        id_vars = ['start_year', 'end_year', 'court_num', 'circuit_num', 
+                   'judge_name', 'year'],
+        value_vars = [f'name_perm{i}' for i in range(1, 8)],
+        value_name = 'name_perm')
+    df = df.drop(columns = 'variable')
     df = df[df.name_perm != '']
     df.drop_duplicates(ignore_index = True, inplace = True)
     return df
 
-def convert_judge_name(year, court, name, dict_type):
-    if dict_type == 1:
-        return str(int(court) * 10000 + int(year)) + name
-    elif dict_type == 2:
-        return str(int(year)) + name
-    else:
-        return name
-        
-def convert_judge_name_series(year, court, name, dict_type):
-    if dict_type == 1:
-        return ((court.astype(int) * 10000 
-                + year.astype(int)).astype(str) 
-                + name)
-    if dict_type == 2:
-        return year.astype(int).astype(str) + name
+def is_current(file_path: pathlib.Path, sources: list[pathlib.Path]) -> bool:
+    """Returns whether 'file_path' exists and is newer than all 'sources'.
     
-def make_name_dicts() -> pd.DataFrame:
-    names = []
-    df = load_file(instructions.NAMES_PATH)
-    df['name_perm'] = df['name_perm'].str.upper()
-    df['concat_name1'] = convert_judge_name_series(
-        df['year'], 
-        df['court_num'], 
-        df['name_perm'], 
-        dict_type = 1)
-    df['concat_name2'] = convert_judge_name_series(
-        df['year'], 
-        df['circuit_num'], 
-        df['name_perm'], 
-        dict_type = 1)
-    df['concat_name3'] = convert_judge_name_series(
-        df['year'], 
-        df['court_num'], 
-        df['name_perm'], 
-        dict_type = 2)
-    df['concat_name4'] = convert_judge_name_series(
-        df['year'], 
-        df['circuit_num'], 
-        df['name_perm'], 
-        dict_type = 2)
-    names.append(names.set_index('concat_name1').to_dict()['judge_name'])
-    names.append(names.set_index('concat_name2').to_dict()['judge_name'])
-    names.append(names.set_index('concat_name3').to_dict()['judge_name'])
-    names.append(names.set_index('concat_name4').to_dict()['judge_name'])
-    names.append(names.set_index('name_perm').to_dict()['judge_name'])
-    names.reset_index()
-    names = names.drop_duplicates(ignore_index = True)
-    return names
+    The modules that create cached data are always included in 'sources' so
+    that changes to the munging code or settings invalidate old caches.
+    
+    """
+    file_path = pathlib.Path(file_path)
+    if not file_path.is_file():
+        return False
+    sources = list(sources) + [pathlib.Path(__file__), 
+                               pathlib.Path(instructions.__file__)]
+    modified = file_path.stat().st_mtime
+    return all(pathlib.Path(s).stat().st_mtime < modified for s in sources)
 
-def main() -> None:
-    warnings.filterwarnings('ignore')
-    # The fjc website isn't working well with requests. So, you need to
-    # manually download and rename for now.
-    # download_fjc()
+def read_cache(file_path: pathlib.Path) -> object:
+    """Returns the pickled cache at 'file_path' or None if it is unreadable."""
+    try:
+        return pd.read_pickle(file_path)
+    except Exception:
+        return None
+
+def write_cache(item: object, file_path: pathlib.Path) -> None:
+    """Pickles 'item' to 'file_path' without leaving a partial file there."""
+    file_path = pathlib.Path(file_path)
+    temp_path = file_path.with_name(f'{file_path.name}.tmp')
+    pd.to_pickle(item, temp_path)
+    os.replace(temp_path, file_path)
+    return
+
+def build_fjc() -> pd.DataFrame:
+    """Returns the munged fjc judges DataFrame, reusing a current cache."""
+    sources = [instructions.SERVICE_PATH, 
+               instructions.CAREER_PATH, 
+               instructions.DEMOGRAPHICS_PATH]
+    if is_current(file_path = instructions.CACHE_PATH, sources = sources):
+        df = read_cache(file_path = instructions.CACHE_PATH)
+        if df is not None:
+            return df
     service, career, demographics = load_fjc()
     df = combine_fjc(service = service, 
                      career = career, 
                      demographics = demographics)
     df = munge_fjc(df = df)
+    write_cache(item = df, file_path = instructions.CACHE_PATH)
+    return df
+
+def main() -> None:
+    warnings.filterwarnings('ignore')
+    # The fjc website isn't working well with requests. So, you need to
+    # manually download and rename for now.
+    # download_fjc()
+    df = build_fjc()
     df.to_csv(instructions.OUTPUT_PATH, index = False)
     names = make_names_df(df = df)
     names.to_csv(instructions.NAMES_PATH, index = False)
@@ -5,27 +5,14 @@ Copyright 2020-2021, Corey Rayburn Yung
 License: Apache-2.0 (https://www.apache.org/licenses/LICENSE-2.0)
 """
 from __future__ import annotations
+import functools
+import pathlib
 
 from judges import fjc_create
 from judges import instructions
 
 
-def convert_judge_name(year, court, name, dict_type):
-    if dict_type == 1:
-        return str(int(court) * 10000 + int(year)) + name
-    elif dict_type == 2:
-        return str(int(year)) + name
-    else:
-        return name
-        
-def convert_judge_name_series(year, court, name, dict_type):
-    if dict_type == 1:
-        return ((court.astype(int) * 10000 
-                + year.astype(int)).astype(str) 
-                + name)
-    if dict_type == 2:
-        return year.astype(int).astype(str) + name
-    
+@functools.lru_cache(maxsize = 1)
 def make_name_dicts() -> list[dict[str, str]]:
     """Converts name perms with other data to a single mapping.
     
@@ -36,35 +23,35 @@ def make_name_dicts() -> list[dict[str, str]]:
     dict on a single column. With a lot of data, this is ugly, but much 
     faster.
     
+    The result is memoized for the life of the process and pickled to disk
+    for later processes, so callers should not modify the returned dicts.
+    
     """
+    cache_path = instructions.NAMES_CACHE_PATH
+    if fjc_create.is_current(file_path = cache_path,
+                             sources = [instructions.NAMES_PATH,
+                                        pathlib.Path(__file__)]):
+        names = fjc_create.read_cache(file_path = cache_path)
+        if names is not None:
+            return names
     names = []
     df = fjc_create.load_file(instructions.NAMES_PATH)
     df['name_perm'] = df['name_perm'].str.upper()
-    df['concat_name1'] = convert_judge_name_series(
-        df['year'], 
-        df['court_num'], 
-        df['name_perm'], 
-        dict_type = 1)
-    df['concat_name2'] = convert_judge_name_series(
-        df['year'], 
-        df['circuit_num'], 
-        df['name_perm'], 
-        dict_type = 1)
-    df['concat_name3'] = convert_judge_name_series(
-        df['year'], 
-        df['court_num'], 
-        df['name_perm'], 
-        dict_type = 2)
-    df['concat_name4'] = convert_judge_name_series(
-        df['year'], 
-        df['circuit_num'], 
-        df['name_perm'], 
-        dict_type = 2)
-    names.append(df.set_index('concat_name1').to_dict()['judge_name'])
-    names.append(df.set_index('concat_name2').to_dict()['judge_name'])
-    names.append(df.set_index('concat_name3').to_dict()['judge_name'])
-    names.append(df.set_index('concat_name4').to_dict()['judge_name'])
-    names.append(df.set_index('name_perm').to_dict()['judge_name'])
+    # Casts and formats the numeric parts of the keys once for all dicts.
+    year = df['year'].astype(int)
+    court_key = (df['court_num'].astype(int) * 10000 + year).astype(str)
+    circuit_key = (df['circuit_num'].astype(int) * 10000 + year).astype(str)
+    year_name = year.astype(str) + df['name_perm']
+    df['concat_name1'] = court_key + df['name_perm']
+    df['concat_name2'] = circuit_key + df['name_perm']
+    df['concat_name3'] = year_name
+    df['concat_name4'] = year_name
+    names.append(dict(zip(df['concat_name1'].values, df['judge_name'].values)))
+    names.append(dict(zip(df['concat_name2'].values, df['judge_name'].values)))
+    names.append(dict(zip(df['concat_name3'].values, df['judge_name'].values)))
+    names.append(dict(zip(df['concat_name4'].values, df['judge_name'].values)))
+    names.append(dict(zip(df['name_perm'].values, df['judge_name'].values)))
+    fjc_create.write_cache(item = names, file_path = cache_path)
     return names
 
 def main() -> None:
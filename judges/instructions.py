@@ -16,11 +16,15 @@ CAREER_FILE = 'fjc_career.csv'
 DEMOGRAPHICS_FILE = 'fjc_demographics.csv'
 OUTPUT_FILE = 'fjc_judges.csv'
 NAMES_FILE = 'fjc_names.csv'
+CACHE_FILE = 'fjc_judges.pkl'
+NAMES_CACHE_FILE = 'fjc_names.pkl'
 SERVICE_PATH = pathlib.Path(FOLDER) / SERVICE_FILE
 CAREER_PATH = pathlib.Path(FOLDER) / CAREER_FILE
 DEMOGRAPHICS_PATH = pathlib.Path(FOLDER) / DEMOGRAPHICS_FILE
 OUTPUT_PATH = pathlib.Path(FOLDER) / OUTPUT_FILE
 NAMES_PATH = pathlib.Path(FOLDER) / NAMES_FILE
+CACHE_PATH = pathlib.Path(FOLDER) / CACHE_FILE
+NAMES_CACHE_PATH = pathlib.Path(FOLDER) / NAMES_CACHE_FILE
 
 SERVICE_COLUMNS = ['nid', 'judge_name', 'court', 'president', 'party', 
                    'aba_rating', 'recess', 'nomination_date', 
@@ -33,15 +37,39 @@ SERVICE_RENAMES = {'court_name' : 'court',
                    'ayes/nays' : 'senate_vote',
                    'commission_date' : 'start_date',
                    'senior_status_date' : 'senior_date'}
+SERVICE_DATES = ['Commission Date', 'Termination Date']
+SERVICE_DTYPES = {'nid' : 'int64',
+                  'Court Name' : 'category',
+                  'Appointing President' : 'category',
+                  'Party of Appointing President' : 'category',
+                  'ABA Rating' : 'category',
+                  'Senate Vote Type' : 'category'}
 CAREER_COLUMNS = ['nid', 'career']
 CAREER_RENAMES = {'professional_career' : 'career'}
+CAREER_DATES = []
+CAREER_DTYPES = {'nid' : 'int64'}
 DEMOGRAPHICS_COLUMNS = ['nid', 'last_name', 'first_name', 'middle_name', 
                         'suffix', 'birth_year', 'gender', 'race']
 DEMOGRAPHICS_RENAMES = {'race_or_ethnicity' : 'race'}
-ALL_COLUMNS = SERVICE_COLUMNS + CAREER_COLUMNS + DEMOGRAPHICS_COLUMNS
+DEMOGRAPHICS_DATES = []
+DEMOGRAPHICS_DTYPES = {'nid' : 'int64',
+                       'Gender' : 'category',
+                       'Race or Ethnicity' : 'category'}
+ALL_COLUMNS = list(dict.fromkeys(
+    SERVICE_COLUMNS + CAREER_COLUMNS + DEMOGRAPHICS_COLUMNS))
+ALL_RENAMES = {**SERVICE_RENAMES, **CAREER_RENAMES, **DEMOGRAPHICS_RENAMES}
+NAME_CHANGES = [{'nid' : 1386716, 'last_name' : 'Randall'},
+                {'nid' : 1382851, 'first_name' : 'Sam'}]
 START_YEAR = 2000
 END_YEAR = 2022
 
+ABA_RATINGS = {
+    'Exceptionally Well Qualified' : 4,
+    'Well Qualified' : 3,
+    'Qualified' : 2,
+    'Not Qualified' : 1}
+PARTIES = {'Democratic' : -1, 'Republican' : 1}
+
 COURT_NUMBERS = {
     'Supreme Court of the United States': 99,
     'U.S. Circuit Court for the Districts of California': 9,
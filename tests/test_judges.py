@@ -1,9 +1,58 @@
+import numpy as np
+import pandas as pd
+
 import judges
 
 
 def test_version():
     assert judges.__version__ == '0.1.0'
 
+def test_encode_senate_vote():
+    df = pd.DataFrame({'senate_vote_type' : ['Voice', 'Roll Call', 
+                                             'Roll Call', 'Roll Call',
+                                             'Roll Call', 'Roll Call'],
+                       'senate_vote' : ['  ', ' 96/2', '//', '', 
+                                        '96/2/1', 'a/b']})
+    df = judges.fjc_create.encode_senate_vote(df = df)
+    assert df['senate_percent'].tolist() == [1.0, 96 / 98, 0.0, 0.0, 0.0, 0.0]
+
+def test_encode_senate_vote_all_voice():
+    df = pd.DataFrame({'senate_vote_type' : ['Voice', 'Voice'],
+                       'senate_vote' : ['  ', 'nan']})
+    df = judges.fjc_create.encode_senate_vote(df = df)
+    assert df['senate_percent'].tolist() == [1.0, 1.0]
+
+def test_map_category():
+    column = pd.Series(['a', None, 'b', 'z', 'a'], dtype = 'category')
+    mapped = judges.fjc_create.map_category(column, {'a' : 1, 'b' : 2})
+    assert mapped[[0, 2, 4]].tolist() == [1, 2, 1]
+    assert mapped[[1, 3]].isna().all()
+    column = pd.Series(['a', 'b', 'a'], dtype = 'category')
+    mapped = judges.fjc_create.map_category(column, {'a' : 1, 'b' : 2})
+    assert mapped.tolist() == [1, 2, 1]
+    assert np.issubdtype(mapped.dtype, np.integer)
+
+def test_fill_reassignments():
+    marker = 'None (reassignment)'
+    df = pd.DataFrame({'party' : [marker, 'A', np.nan, marker, 
+                                  'B', marker, marker]})
+    df = judges.fjc_create.fill_reassignments(df = df)
+    expected = [marker, 'A', np.nan, np.nan, 'B', 'B', 'B']
+    assert df['party'].isna().tolist() == pd.isna(expected).tolist()
+    assert df['party'].dropna().tolist() == [marker, 'A', 'B', 'B', 'B']
+
+def test_name_changes():
+    df = pd.DataFrame({'nid' : [1386716, 1386716, 1],
+                       'first_name' : ['Carolyn', 'Carolyn', 'Ronnie'],
+                       'last_name' : ['King', 'King', 'Abrams']})
+    df = judges.fjc_create.name_changes(df = df)
+    added = df.iloc[3:]
+    assert len(df) == 5
+    assert added['nid'].tolist() == [1386716, 1386716]
+    assert added['first_name'].tolist() == ['Carolyn', 'Carolyn']
+    assert added['last_name'].tolist() == ['Randall', 'Randall']
+    assert df.iloc[:3]['last_name'].tolist() == ['King', 'King', 'Abrams']
+
 if __name__ == '__main__':
     judges.fjc_create.main()
-    judges.fjc_match.main()
\ No newline at end of file
+    judges.fjc_match.main()